@@ -1,5 +1,5 @@
 from __future__ import annotations
-import numpy as np
+import math
 
 
 class DualNumber:
@@ -36,58 +36,86 @@ class DualNumber:
             return x
         return DualNumber(float(x))
 
+    # Arithmetic special-cases plain numbers instead of going through normalize(), which would allocate
+    # a throwaway DualNumber for every float operand
+
     def __add__(self, other):
-        other = DualNumber.normalize(other)
-        return DualNumber(self.a + other.a, self.b + other.b)
+        if isinstance(other, DualNumber):
+            return DualNumber(self.a + other.a, self.b + other.b)
+        return DualNumber(self.a + float(other), self.b)
 
     def __radd__(self, other):
-        return DualNumber.normalize(other) + self
+        if isinstance(other, DualNumber):
+            return other + self
+        return DualNumber(float(other) + self.a, self.b)
 
     def __sub__(self, other):
-        other = DualNumber.normalize(other)
-        return DualNumber(self.a - other.a, self.b - other.b)
+        if isinstance(other, DualNumber):
+            return DualNumber(self.a - other.a, self.b - other.b)
+        return DualNumber(self.a - float(other), self.b)
 
     def __rsub__(self, other):
-        return DualNumber.normalize(other) - self
+        if isinstance(other, DualNumber):
+            return other - self
+        return DualNumber(float(other) - self.a, -self.b)
 
     def __neg__(self):
         return DualNumber(-self.a, -self.b)
 
     def __abs__(self):
-        return DualNumber(abs(self.a), self.b * np.sign(self.a))
+        a = self.a
+        sign = 1. if a > 0 else (-1. if a < 0 else (0. if a == 0 else math.nan))
+        return DualNumber(abs(a), self.b * sign)
 
     def __mul__(self, other):
-        other = DualNumber.normalize(other)
-        return DualNumber(self.a * other.a, self.a * other.b + other.a * self.b)
+        if isinstance(other, DualNumber):
+            return DualNumber(self.a * other.a, self.a * other.b + other.a * self.b)
+        other = float(other)
+        return DualNumber(self.a * other, other * self.b)
 
     def __rmul__(self, other):
-        return DualNumber.normalize(other) * self
+        if isinstance(other, DualNumber):
+            return other * self
+        other = float(other)
+        return DualNumber(other * self.a, other * self.b)
 
     def __truediv__(self, other):
-        other = DualNumber.normalize(other)
-        return DualNumber(self.a / other.a, (self.b * other.a - self.a * other.b) / (other.a ** 2))
+        if isinstance(other, DualNumber):
+            return DualNumber(self.a / other.a, (self.b * other.a - self.a * other.b) / (other.a ** 2))
+        other = float(other)
+        return DualNumber(self.a / other, self.b / other)
 
     def __rtruediv__(self, other):
-        return DualNumber.normalize(other) / self
+        if isinstance(other, DualNumber):
+            return other / self
+        other = float(other)
+        return DualNumber(other / self.a, -other * self.b / (self.a ** 2))
 
     def __floordiv__(self, other):
         print("WARNING: Using Dual floordiv, no gradient")
-        other = DualNumber.normalize(other)
-        return DualNumber(self.a // other.a, 0)
+        other = other.a if isinstance(other, DualNumber) else float(other)
+        return DualNumber(self.a // other, 0)
 
     def __rfloordiv__(self, other):
-        return DualNumber.normalize(other) // self
+        if isinstance(other, DualNumber):
+            return other // self
+        print("WARNING: Using Dual floordiv, no gradient")
+        return DualNumber(float(other) // self.a, 0)
 
     def __mod__(self, other):
         print("WARNING: Using Dual mod, no gradient")
-        other = DualNumber.normalize(other)
-        return DualNumber(self.a % other.a, 0)
+        other = other.a if isinstance(other, DualNumber) else float(other)
+        return DualNumber(self.a % other, 0)
 
     def __rmod__(self, other):
-        return DualNumber.normalize(other) % self
+        if isinstance(other, DualNumber):
+            return other % self
+        print("WARNING: Using Dual mod, no gradient")
+        return DualNumber(float(other) % self.a, 0)
 
     def __pow__(self, other):
-        other = DualNumber.normalize(other)
+        if not isinstance(other, DualNumber):
+            return self._pow_float(float(other))
         if other.a == 1:
             return self
         if self.a == 0:
@@ -108,12 +136,33 @@ class DualNumber:
         if other.b != 0:
             if self.a < 0:
                 return DualNumber(real_power, float('nan'))
-            im_adjust += other.b * np.log(self.a)
+            im_adjust += other.b * math.log(self.a)
 
         return DualNumber(real_power, real_power * im_adjust)
 
+    def _pow_float(self, other: float) -> DualNumber:
+        # Same as __pow__ with a zero-tangent exponent
+        if other == 1:
+            return self
+        if self.a == 0:
+            if other == 0:
+                return DualNumber(1, float('nan'))
+            if other < 0:
+                return DualNumber(float('nan'), float('nan'))
+            if other < 1:
+                return DualNumber(0, float('nan'))
+            return DualNumber(0, 0)
+        real_power = self.a ** other
+        return DualNumber(real_power, real_power * (self.b * other / self.a))
+
     def __rpow__(self, other):
-        return DualNumber.normalize(other) ** self
+        if isinstance(other, DualNumber):
+            return other ** self
+        other = float(other)
+        if other > 0 and self.a != 1:
+            real_power = other ** self.a
+            return DualNumber(real_power, real_power * (self.b * math.log(other)))
+        return DualNumber(other) ** self
 
     def __lshift__(self, other: int):
         print("WARNING: Using Dual bitshift, unoptimized")
@@ -124,24 +173,21 @@ class DualNumber:
         return self / (pow(2, other))
 
     def __eq__(self, other):
-        other = DualNumber.normalize(other)
-        return (self.a == other.a) and (self.b == other.b)
+        if isinstance(other, DualNumber):
+            return (self.a == other.a) and (self.b == other.b)
+        return (self.a == float(other)) and (self.b == 0)
 
     def __lt__(self, other):
-        other = DualNumber.normalize(other)
-        return self.a < other.a
+        return self.a < (other.a if isinstance(other, DualNumber) else float(other))
 
     def __le__(self, other):
-        other = DualNumber.normalize(other)
-        return self.a <= other.a
+        return self.a <= (other.a if isinstance(other, DualNumber) else float(other))
 
     def __gt__(self, other):
-        other = DualNumber.normalize(other)
-        return self.a > other.a
+        return self.a > (other.a if isinstance(other, DualNumber) else float(other))
 
     def __ge__(self, other):
-        other = DualNumber.normalize(other)
-        return self.a >= other.a
+        return self.a >= (other.a if isinstance(other, DualNumber) else float(other))
 
     def __hash__(self):
         return hash((self.a, self.b))
@@ -2,6 +2,8 @@ from __future__ import annotations
 import numpy as np
 from typing import Optional
 
+# Tile edge used by DualTensor.fused_matmul along m, k and n; three float64 tiles of 128 x 128 fit in a typical L2
+MATMUL_BLOCK = 128
 
 class DualTensor:
     __slots__ = 'a', 'b', 'shape'
@@ -10,9 +12,10 @@ class DualTensor:
     b: np.ndarray
 
     def __init__(self, a: Optional[np.ndarray] = None, b: Optional[np.ndarray] = None):
+        # Buffers are taken as-is (no copy) when their dtypes already agree
         self.shape = a.shape if a is not None else (b.shape if b is not None else (1,))
-        self.a = a if a is not None else np.zeros(self.shape)
-        self.b = b.astype(self.a.dtype) if b is not None else np.zeros(self.shape, dtype=self.a.dtype)
+        self.a = a if a is not None else np.zeros(self.shape, dtype=b.dtype if b is not None else np.float64)
+        self.b = b.astype(self.a.dtype, copy=False) if b is not None else np.zeros(self.shape, dtype=self.a.dtype)
         assert self.a.dtype == self.b.dtype
 
     def re(self) -> np.ndarray:
@@ -43,28 +46,30 @@ class DualTensor:
             raise ValueError(f"Expected shape {expected_shape}, got {x.shape}")
 
     @staticmethod
-    def normalize(x, expected_shape=None) -> DualTensor:
+    def normalize(x, expected_shape=None, dtype=None) -> DualTensor:
         if isinstance(x, DualTensor):
             DualTensor.check_shape(x, expected_shape)
             return x
         if isinstance(x, np.ndarray):
             DualTensor.check_shape(x, expected_shape)
             return DualTensor(x)
-        return DualTensor(np.full(expected_shape if expected_shape is not None else (1,), x))
+        # Python scalars take the tensor's dtype unless they need a wider one (e.g. a float with an int tensor)
+        dtype = np.result_type(dtype, x) if dtype is not None else None
+        return DualTensor(np.full(expected_shape if expected_shape is not None else (1,), x, dtype=dtype))
 
     def __add__(self, other):
-        other = DualTensor.normalize(other)
+        other = DualTensor.normalize(other, dtype=self.a.dtype)
         return DualTensor(self.a + other.a, self.b + other.b)
 
     def __radd__(self, other):
-        return DualTensor.normalize(other) + self
+        return DualTensor.normalize(other, dtype=self.a.dtype) + self
 
     def __sub__(self, other):
-        other = DualTensor.normalize(other)
+        other = DualTensor.normalize(other, dtype=self.a.dtype)
         return DualTensor(self.a - other.a, self.b - other.b)
 
     def __rsub__(self, other):
-        return DualTensor.normalize(other) - self
+        return DualTensor.normalize(other, dtype=self.a.dtype) - self
 
     def __neg__(self):
         return DualTensor(-self.a, -self.b)
@@ -74,44 +79,74 @@ class DualTensor:
         return DualTensor(abs(self.a), self.b * sgn)
 
     def __mul__(self, other):
-        other = DualTensor.normalize(other)
+        other = DualTensor.normalize(other, dtype=self.a.dtype)
         return DualTensor(self.a * other.a, self.a * other.b + self.b * other.a)
 
     def __rmul__(self, other):
-        return DualTensor.normalize(other) * self
+        return DualTensor.normalize(other, dtype=self.a.dtype) * self
+
+    @staticmethod
+    def fused_matmul(a, b, c, d, block=MATMUL_BLOCK):
+        # (a + bε)(c + dε) = ac + (ad + bc)ε for 2-d operands, tiled over m, k and n: each tile of `a` and `c`
+        # is used for both of its products while still in cache. Returns contiguous primal and tangent arrays
+        (m, k), n = a.shape, c.shape[1]
+        dtype = np.result_type(a, b, c, d)
+        re = np.empty((m, n), dtype=dtype)
+        im = np.empty((m, n), dtype=dtype)
+        tmp = np.empty((min(m, block), min(n, block)), dtype=dtype)
+        for i in range(0, m, block):
+            rows = slice(i, i + block)
+            for j in range(0, n, block):
+                cols = slice(j, j + block)
+                re_ij, im_ij = re[rows, cols], im[rows, cols]
+                t = tmp[:re_ij.shape[0], :re_ij.shape[1]]
+                for l in range(0, k, block):
+                    inner = slice(l, l + block)
+                    a_il, c_lj = a[rows, inner], c[inner, cols]
+                    if l == 0:
+                        np.matmul(a_il, c_lj, out=re_ij)
+                        np.matmul(a_il, d[inner, cols], out=im_ij)
+                    else:
+                        np.matmul(a_il, c_lj, out=t)
+                        re_ij += t
+                        np.matmul(a_il, d[inner, cols], out=t)
+                        im_ij += t
+                    np.matmul(b[rows, inner], c_lj, out=t)
+                    im_ij += t
+        return re, im
 
     def __matmul__(self, other):
-        other = DualTensor.normalize(other)
+        other = DualTensor.normalize(other, dtype=self.a.dtype)
         return DualTensor(self.a @ other.a, self.a @ other.b + self.b @ other.a)
 
     def __rmatmul__(self, other):
-        return DualTensor.normalize(other) @ self
+        return DualTensor.normalize(other, dtype=self.a.dtype) @ self
 
     def __truediv__(self, other):
-        other = DualTensor.normalize(other)
+        other = DualTensor.normalize(other, dtype=self.a.dtype)
         return DualTensor(self.a / other.a, (self.b * other.a - self.a * other.b) / (other.a ** 2))
 
     def __rtruediv__(self, other):
-        return DualTensor.normalize(other) / self
+        return DualTensor.normalize(other, dtype=self.a.dtype) / self
 
     def __floordiv__(self, other):
         print("WARNING: Using Dual floordiv, no gradient")
-        other = DualTensor.normalize(other, self.shape)
-        return DualTensor(self.a // other.a, np.zeros(self.shape))
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
+        return DualTensor(self.a // other.a, np.zeros_like(self.a))
 
     def __rfloordiv__(self, other):
-        return DualTensor.normalize(other, self.shape) // self
+        return DualTensor.normalize(other, self.shape, self.a.dtype) // self
 
     def __mod__(self, other):
         print("WARNING: Using Dual mod, no gradient")
-        other = DualTensor.normalize(other, self.shape)
-        return DualTensor(self.a % other.a, np.zeros(self.shape, dtype=self.a.dtype))
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
+        return DualTensor(self.a % other.a, np.zeros_like(self.a))
 
     def __rmod__(self, other):
-        return DualTensor.normalize(other, self.shape) % self
+        return DualTensor.normalize(other, self.shape, self.a.dtype) % self
 
     def __pow__(self, other):
-        other = DualTensor.normalize(other, (1,))
+        other = DualTensor.normalize(other, (1,), self.a.dtype)
         if other.a == 1:
             return self
         if (self.a == 0).any():
@@ -124,7 +159,7 @@ class DualTensor:
         return DualTensor(real_power, real_power * im_adjust)
 
     def __rpow__(self, other):
-        return DualTensor.normalize(other) ** self
+        return DualTensor.normalize(other, dtype=self.a.dtype) ** self
 
     def __lshift__(self, other: int):
         print("WARNING: Using Dual bitshift, unoptimized")
@@ -135,23 +170,23 @@ class DualTensor:
         return self / (pow(2, other))
 
     def __eq__(self, other):
-        other = DualTensor.normalize(other, self.shape)
-        return (self.a == other.a) and (self.b == other.b)
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
+        return (self.a == other.a) & (self.b == other.b)
 
     def __lt__(self, other):
-        other = DualTensor.normalize(other, self.shape)
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
         return self.a < other.a
 
     def __le__(self, other):
-        other = DualTensor.normalize(other, self.shape)
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
         return self.a <= other.a
 
     def __gt__(self, other):
-        other = DualTensor.normalize(other, self.shape)
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
         return self.a > other.a
 
     def __ge__(self, other):
-        other = DualTensor.normalize(other, self.shape)
+        other = DualTensor.normalize(other, self.shape, self.a.dtype)
         return self.a >= other.a
 
     def __hash__(self):
@@ -0,0 +1,57 @@
+from queue import Queue
+from threading import Event, Thread
+import numpy as np
+
+_END = object()
+
+
+class _Failure:
+    __slots__ = 'error',
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def iter_chunks(data: np.ndarray, chunk_size: int):
+    for start in range(0, len(data), chunk_size):
+        # np.array forces memory-mapped chunks to actually be read
+        yield np.array(data[start:start + chunk_size])
+
+
+def as_batches(data, chunk_size: int):
+    if isinstance(data, np.ndarray):
+        return iter_chunks(data, chunk_size)
+    return data
+
+
+def prefetch(batches):
+    # Double buffering: the next batch is produced on a background thread
+    # while the caller is busy with the current one
+    queue = Queue(maxsize=1)
+    stop = Event()
+
+    def worker():
+        try:
+            for batch in batches:
+                queue.put(batch)
+                if stop.is_set():
+                    return
+        except BaseException as e:
+            queue.put(_Failure(e))
+            return
+        queue.put(_END)
+
+    Thread(target=worker, daemon=True).start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        # Unblock a worker waiting on a full queue so it can observe `stop`
+        while not queue.empty():
+            queue.get_nowait()
@@ -1,24 +1,33 @@
 import timeit
-import torch
-from benchmark.BenchmarkNetTorch import BenchmarkNetTorch as TorchNet
-from benchmark.BenchmarkNetDual import BenchmarkNetDual as DualNet
-from memory_profiler import memory_usage
+
+
+# torch and memory_profiler take seconds to import, so they are only loaded by the benchmarks that need them
+def load_net(nettype):
+    if nettype == "dual":
+        from benchmark.BenchmarkNetDual import BenchmarkNetDual
+        return BenchmarkNetDual
+    if nettype == "auto":
+        from benchmark.BenchmarkNetTorch import BenchmarkNetTorch
+        return BenchmarkNetTorch
+    raise ValueError(f"Unknown net type {nettype}")
+
+
+def random_layer_gradvec(i, depth, size, rnd):
+    if i < depth:
+        return rnd(size, size), rnd(size)
+    return rnd(size, 1), rnd(1)
+
 
 def random_gradvec(depth, size, rnd):
-    vec = []
-    for i in range(depth):
-        vec.append((
-            rnd(size, size),
-            rnd(size)
-        ))
-    vec.append((
-        rnd(size, 1),
-        rnd(1)
-    ))
-    return vec
+    return [random_layer_gradvec(i, depth, size, rnd) for i in range(depth + 1)]
+
+
+def random_gradvec_source(depth, size, rnd):
+    return lambda i: random_layer_gradvec(i, depth, size, rnd)
 
 
 def rand(*size):
+    import torch
     return torch.normal(0, 5, size=size).numpy()
 
 
@@ -43,38 +52,70 @@ def run_benchmark_(name, net, batch_size):
 
 
 def run_benchmark(depth, layer_size, batch_size):
-    yield from run_benchmark_("dual", DualNet(depth, layer_size), batch_size)
-    yield from run_benchmark_("auto", TorchNet(depth, layer_size), batch_size)
+    yield from run_benchmark_("dual", load_net("dual")(depth, layer_size), batch_size)
+    yield from run_benchmark_("auto", load_net("auto")(depth, layer_size), batch_size)
+
+
+# Seconds between RSS samples; the default 0.1 s misses the peak of calls shorter than that
+MEMORY_INTERVAL = 0.001
 
 
 def memory_vectorgrad(net, batch_size):
+    from memory_profiler import memory_usage
     print("vectorgrad")
     vec = random_gradvec(net.depth, net.layer_size, rand)
     x = rand(batch_size, net.layer_size)
-    return memory_usage((net.vectorgrad, (x, vec)), max_usage=True)
+    return memory_usage((net.vectorgrad, (x, vec)), max_usage=True, interval=MEMORY_INTERVAL)
+
+
+def memory_vectorgrad_streaming(net, batch_size):
+    from memory_profiler import memory_usage
+    print("vectorgrad (streaming)")
+    source = random_gradvec_source(net.depth, net.layer_size, rand)
+    x = rand(batch_size, net.layer_size)
+    return memory_usage((net.vectorgrad_streaming, (x, source)), max_usage=True, interval=MEMORY_INTERVAL)
 
 
 def memory_fullgrad(net, batch_size):
+    from memory_profiler import memory_usage
     print("fullgrad")
     x = rand(batch_size, net.layer_size)
-    return memory_usage((net.fullgrad, (x,)), max_usage=True)
+    return memory_usage((net.fullgrad, (x,)), max_usage=True, interval=MEMORY_INTERVAL)
 
 
-def run_memory_(name, net, batch_size):
+def run_memory_(name, net, batch_size, full=True):
     yield (name, "vector", net.depth, net.layer_size, batch_size, memory_vectorgrad(net, batch_size))
-    yield (name, "full", net.depth, net.layer_size, batch_size, memory_fullgrad(net, batch_size))
+    if full:
+        yield (name, "full", net.depth, net.layer_size, batch_size, memory_fullgrad(net, batch_size))
+
+
+def run_memory(depth, layer_size, batch_size, full=True):
+    net = load_net("dual")(depth, layer_size)
+    # Streaming goes first: freed tangents stay resident in the allocator, so measuring it after vectorgrad
+    # would just report vectorgrad's high-water mark again
+    yield ("dual", "vector_streaming", depth, layer_size, batch_size, memory_vectorgrad_streaming(net, batch_size))
+    yield from run_memory_("dual", net, batch_size, full)
+    yield from run_memory_("auto", load_net("auto")(depth, layer_size), batch_size, full)
+
+
+# (depths, layer_size, batch_size, full). The second sweep uses deep, wide nets where fullgrad is out of reach,
+# but the O(depth) tangents of vectorgrad against O(one layer) for streaming show up in the memory column
+MEMORY_SWEEPS = [
+    (range(4, 11), 10, 20, True),
+    ((16, 32, 64, 128), 256, 20, False),
+]
 
 
-def run_memory(depth, layer_size, batch_size):
-    yield from run_memory_("dual", DualNet(depth, layer_size), batch_size)
-    yield from run_memory_("auto", TorchNet(depth, layer_size), batch_size)
+def sweep_memory(sweeps=MEMORY_SWEEPS, path='benchmark_memory.csv'):
+    with open(path, 'a') as f:
+        # f.write('nettype,gradtype,depth,layer_size,batch_size,memory\n')
+        for depths, layer_size, batch_size, full in sweeps:
+            for depth in depths:
+                for b in run_memory(depth, layer_size, batch_size, full):
+                    f.write(','.join(map(str, b)))
+                    f.write('\n')
+                    f.flush()
 
 
 if __name__ == '__main__':
-    for depth in range(4, 11):
-        with open('benchmark.csv', 'a') as f:
-            # f.write('nettype,gradtype,depth,layer_size,batch_size,memory\n')
-            for b in run_memory(depth, 10, 20):
-                f.write(','.join(map(str, b)))
-                f.write('\n')
-                f.flush()
+    sweep_memory()
@@ -1,25 +1,44 @@
+from __future__ import annotations
 from DualTensor import DualTensor
-from benchmark.BenchmarkNetTorch import BenchmarkNetTorch
+from benchmark.BatchStream import as_batches, prefetch
+from benchmark.GradCache import GradCache
+from typing import TYPE_CHECKING
 import numpy as np
 
+if TYPE_CHECKING:
+    from benchmark.BenchmarkNetTorch import BenchmarkNetTorch
+
+
+def _dualpass(params, tangent_at, x):
+    x = DualTensor(x)
+    for i, (w, b) in enumerate(params):
+        (gw, gb) = tangent_at(i)
+        x = x @ DualTensor(w, gw) + DualTensor(b, gb)
+    return x
+
+
+def jvp(params, tangents, x):
+    return _dualpass(params, tangents.__getitem__, x)
+
 
 class BenchmarkNetDual:
 
-    def __init__(self, depth: int, layer_size: int):
+    def __init__(self, depth: int, layer_size: int, dtype=np.float64):
         self.depth = depth
         self.layer_size = layer_size
+        self.fullgrad_cache = None
         self.layers = []
         for i in range(depth):
             self.layers.append(
                 [
-                    DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), (layer_size, layer_size)).astype(np.float)),
-                    DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), layer_size).astype(np.float))
+                    DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), (layer_size, layer_size)).astype(dtype)),
+                    DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), layer_size).astype(dtype))
                 ]
             )
         self.layers.append(
             [
-                DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), (layer_size, 1)).astype(np.float)),
-                DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), 1).astype(np.float))
+                DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), (layer_size, 1)).astype(dtype)),
+                DualTensor(np.random.normal(0, np.sqrt(1 / layer_size), 1).astype(dtype))
             ]
         )
 
@@ -31,6 +50,9 @@ class BenchmarkNetDual:
             l[0] = DualTensor(n.weight.detach().numpy().T)
             l[1] = DualTensor(n.bias.detach().numpy())
 
+    def params(self):
+        return [(w.re(), b.re()) for w, b in self.layers]
+
     def fullpass(self, x):
         x = DualTensor(x)
         for (w, b) in self.layers:
@@ -41,15 +63,33 @@ class BenchmarkNetDual:
         return self.fullpass(x).re()
 
     def vectorgrad(self, x, vec):
-        for i in range(len(self.layers)):
-            (w, b) = self.layers[i]
-            (gw, gb) = vec[i]
-            self.layers[i] = [DualTensor(w.re(), gw), DualTensor(b.re(), gb)]
-        return self.fullpass(x).im().sum()
+        return jvp(self.params(), vec, x).im().sum()
+
+    def streampass(self, x, tangent_source):
+        # Tangents live only for the duration of a single layer
+        return _dualpass(self.params(), tangent_source, x)
+
+    def vectorgrad_streaming(self, x, tangent_source):
+        return self.streampass(x, tangent_source).im().sum()
+
+    def enable_fullgrad_cache(self, max_bytes: int = 256 * 2 ** 20, path=None):
+        self.fullgrad_cache = GradCache(max_bytes, path)
+        return self.fullgrad_cache
 
     def fullgrad(self, x):
-        grads = [(np.zeros(w.shape), np.zeros(b.shape)) for w, b in self.layers]
-        vec = [(np.zeros(w.shape), np.zeros(b.shape)) for w, b in self.layers]
+        if self.fullgrad_cache is None:
+            return self.fullgrad_uncached(x)
+        # Keys are content fingerprints, so clone_weights or in-place weight edits never hit stale entries
+        key = self.fullgrad_cache.key(self.params(), x)
+        grads = self.fullgrad_cache.get(key)
+        if grads is None:
+            grads = self.fullgrad_uncached(x)
+            self.fullgrad_cache.put(key, grads)
+        return grads
+
+    def fullgrad_uncached(self, x):
+        grads = [(np.zeros_like(w.re()), np.zeros_like(b.re())) for w, b in self.layers]
+        vec = [(np.zeros_like(w.re()), np.zeros_like(b.re())) for w, b in self.layers]
         for i in range(len(self.layers)):
             w, b = self.layers[i]
             for idx in np.ndindex(w.shape):
@@ -62,6 +102,22 @@ class BenchmarkNetDual:
                 vec[i][1][idx] = 0
         return grads
 
+    def vectorgrad_batches(self, batches, vec, chunk_size=1024):
+        total = 0
+        for x in prefetch(as_batches(batches, chunk_size)):
+            total += self.vectorgrad(x, vec)
+        return total
+
+    def fullgrad_batches(self, batches, chunk_size=1024):
+        # Like vectorgrad_batches, an empty stream sums to zero rather than failing
+        total = [(np.zeros_like(w.re()), np.zeros_like(b.re())) for w, b in self.layers]
+        for x in prefetch(as_batches(batches, chunk_size)):
+            grads = self.fullgrad(x)
+            for (tw, tb), (gw, gb) in zip(total, grads):
+                tw += gw
+                tb += gb
+        return total
+
 
 if __name__ == '__main__':
     net = BenchmarkNetDual(3, 4)
@@ -0,0 +1,61 @@
+from collections import Counter
+import numpy as np
+from DualTensor import DualTensor
+from benchmark.BenchmarkNetDual import jvp
+
+stats = Counter()
+_init = DualTensor.__init__
+
+
+def _counting_init(self, a=None, b=None):
+    _init(self, a, b)
+    stats['tensors'] += 1
+    if a is not None and self.a is not a:
+        stats['copies'] += 1
+    if b is not None and self.b is not b:
+        stats['copies'] += 1
+    if a is None or b is None:
+        stats['zero buffers'] += 1
+
+
+def count(f):
+    # Tally DualTensor constructions, buffer copies made by the constructor and zero buffers it allocates
+    stats.clear()
+    DualTensor.__init__ = _counting_init
+    try:
+        result = f()
+    finally:
+        DualTensor.__init__ = _init
+    return dict(stats), result
+
+
+def random_net(depth, size, dtype):
+    params = [(np.random.normal(size=(size, size)), np.random.normal(size=size)) for _ in range(depth)]
+    params.append((np.random.normal(size=(size, 1)), np.random.normal(size=1)))
+    return [(w.astype(dtype), b.astype(dtype)) for w, b in params]
+
+
+OPS = {
+    'add': lambda x: x + x,
+    'add scalar': lambda x: x + 1.5,
+    'mul scalar': lambda x: x * 2.5,
+    'truediv scalar': lambda x: x / 2.5,
+    'pow': lambda x: abs(x) ** 2.,
+    'floordiv': lambda x: x // 2.5,
+    'mod': lambda x: x % 2.5,
+    'lshift': lambda x: x << 1,
+}
+
+
+if __name__ == '__main__':
+    depth, size, batch_size = 10, 64, 128
+    for dtype in (np.float32, np.float64):
+        params = random_net(depth, size, dtype)
+        tangents = random_net(depth, size, dtype)
+        x = np.random.normal(size=(batch_size, size)).astype(dtype)
+        counts, out = count(lambda: jvp(params, tangents, x))
+        print(f'{dtype.__name__} forward pass (depth {depth}): {counts}, output dtype {out.a.dtype}')
+        t = DualTensor(x, x.copy())
+        for name, op in OPS.items():
+            counts, out = count(lambda: op(t))
+            print(f'    {name:>15}: {counts}, output dtype {out.a.dtype}/{out.b.dtype}')
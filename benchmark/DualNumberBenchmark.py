@@ -0,0 +1,41 @@
+import math
+import timeit
+import numpy as np
+from DualNumber import DualNumber
+
+# Each case is (name, fast path, baseline). The baseline reproduces the pre-fast-path cost of
+# promoting the float operand through DualNumber.normalize before doing dual-dual arithmetic
+x = DualNumber(1.5, 0.5)
+c = 2.5
+CASES = [
+    ('add', lambda: x + c, lambda: x + DualNumber.normalize(c)),
+    ('radd', lambda: c + x, lambda: DualNumber.normalize(c) + x),
+    ('sub', lambda: x - c, lambda: x - DualNumber.normalize(c)),
+    ('rsub', lambda: c - x, lambda: DualNumber.normalize(c) - x),
+    ('mul', lambda: x * c, lambda: x * DualNumber.normalize(c)),
+    ('rmul', lambda: c * x, lambda: DualNumber.normalize(c) * x),
+    ('truediv', lambda: x / c, lambda: x / DualNumber.normalize(c)),
+    ('rtruediv', lambda: c / x, lambda: DualNumber.normalize(c) / x),
+    ('pow', lambda: x ** c, lambda: x ** DualNumber.normalize(c)),
+    ('rpow', lambda: c ** x, lambda: DualNumber.normalize(c) ** x),
+    ('abs', lambda: abs(x), lambda: DualNumber(abs(x.a), x.b * np.sign(x.a))),
+    # Reference rows: dual-dual and plain float arithmetic are unaffected by the fast paths
+    ('dual mul', lambda: x * x, lambda: x * x),
+    ('float mul', lambda: c * c, lambda: c * c),
+    ('log', lambda: math.log(c), lambda: np.log(c)),
+]
+
+
+def ops_per_sec(f, number=100000, repeat=5):
+    return number / min(timeit.repeat(f, number=number, repeat=repeat))
+
+
+def run_benchmark():
+    for name, fast, baseline in CASES:
+        yield name, ops_per_sec(baseline), ops_per_sec(fast)
+
+
+if __name__ == '__main__':
+    print(f'{"op":>10} {"baseline ops/s":>15} {"ops/s":>15} {"speedup":>8}')
+    for name, base, fast in run_benchmark():
+        print(f'{name:>10} {base:15.0f} {fast:15.0f} {fast / base:7.2f}x')
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import os
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def fingerprint(arrays):
+    hasher = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        # Shape and dtype are part of the key: equal buffers may hold different arrays
+        hasher.update(f'{a.dtype.str}{a.shape}'.encode())
+        hasher.update(a.data)
+    return hasher.hexdigest()
+
+
+def _nbytes(grads):
+    return sum(w.nbytes + b.nbytes for w, b in grads)
+
+
+def _copy(grads):
+    return [(w.copy(), b.copy()) for w, b in grads]
+
+
+class GradCache:
+    # LRU cache of per-layer (weight, bias) gradients keyed by the content of the weights and the input.
+    # Safe to share between threads, like the net it is attached to
+
+    def __init__(self, max_bytes: int = 256 * 2 ** 20, path=None):
+        self.max_bytes = max_bytes
+        # np.savez appends .npz to other names, so normalise here to load from where save() writes
+        if path is not None and not str(path).endswith('.npz'):
+            path = f'{path}.npz'
+        self.path = path
+        self.nbytes = 0
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def key(params, x):
+        return fingerprint([t for layer in params for t in layer] + [x])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        with self.lock:
+            grads = self.entries.get(key)
+            if grads is None:
+                return None
+            self.entries.move_to_end(key)
+        # Stored entries are never modified in place, so copying can happen outside the lock
+        return _copy(grads)
+
+    def put(self, key, grads):
+        size = _nbytes(grads)
+        if size > self.max_bytes:
+            return
+        grads = _copy(grads)
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= _nbytes(self.entries.pop(key))
+            self.entries[key] = grads
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= _nbytes(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def save(self, path=None):
+        path = path if path is not None else self.path
+        with self.lock:
+            entries = list(self.entries.items())
+        arrays = {}
+        for key, grads in entries:
+            for i, (w, b) in enumerate(grads):
+                arrays[f'{key}_{i}_w'] = w
+                arrays[f'{key}_{i}_b'] = b
+        np.savez(path, **arrays)
+
+    def load(self, path):
+        with np.load(path) as data:
+            loaded = OrderedDict()
+            for name in data.files:
+                key, i, part = name.rsplit('_', 2)
+                layers = loaded.setdefault(key, [])
+                if part == 'w':
+                    layers.append([data[name], None])
+                else:
+                    layers[int(i)][1] = data[name]
+        for key, grads in loaded.items():
+            self.put(key, [(w, b) for w, b in grads])
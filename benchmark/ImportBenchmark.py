@@ -0,0 +1,35 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('torch', 'memory_profiler', 'pandas', 'seaborn', 'matplotlib')
+_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def import_times(statement):
+    # Module -> (cumulative import time in microseconds, nesting level), as reported by `python -X importtime`
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m is not None:
+            times[m.group(4)] = (int(m.group(2)), (len(m.group(3)) - 1) // 2)
+    return times
+
+
+def startup_benchmark(statement):
+    times = import_times(statement)
+    heavy = sorted({name.split('.')[0] for name in times} & set(HEAVY))
+    top = {name: t for name, (t, level) in times.items() if level == 0}
+    return sum(top.values()), heavy, top
+
+
+if __name__ == '__main__':
+    for module in ('benchmark.BenchmarkNetDual', 'benchmark.Benchmark', 'benchmark.BenchmarkNetTorch'):
+        total, heavy, times = startup_benchmark(f'import {module}')
+        print(f'{module}: {total / 1000:.1f} ms, heavy dependencies: {heavy or "none"}')
+        for name, t in sorted(times.items(), key=lambda kv: -kv[1])[:5]:
+            print(f'    {name}: {t / 1000:.1f} ms')
@@ -0,0 +1,30 @@
+import timeit
+import numpy as np
+from DualTensor import DualTensor
+
+
+def separate_matmul(a, b, c, d):
+    return a @ c, a @ d + b @ c
+
+
+def time_matmul(f, a, b, c, d, repeat=5):
+    number = max(1, int(1e8 // (a.size * c.shape[1])))
+    return min(timeit.repeat(lambda: f(a, b, c, d), number=number, repeat=repeat)) / number
+
+
+def run_benchmark(shapes, dtype=np.float64, blocks=(64, 128, 256)):
+    for m, k, n in shapes:
+        a, b = np.random.normal(size=(2, m, k)).astype(dtype)
+        c, d = np.random.normal(size=(2, k, n)).astype(dtype)
+        row = [time_matmul(separate_matmul, a, b, c, d)]
+        for block in blocks:
+            row.append(time_matmul(lambda *args: DualTensor.fused_matmul(*args, block=block), a, b, c, d))
+        yield (m, k, n, *row)
+
+
+if __name__ == '__main__':
+    # Separate products (what __matmul__ does) against the tiled DualTensor.fused_matmul, to tune MATMUL_BLOCK
+    shapes = [(20, 10, 10), (32, 32, 32), (64, 64, 64), (128, 64, 64), (256, 128, 128), (1024, 256, 256), (4096, 512, 512)]
+    print('m,k,n,separate_ms,fused_64_ms,fused_128_ms,fused_256_ms')
+    for m, k, n, *times in run_benchmark(shapes):
+        print(','.join(map(str, (m, k, n, *(f'{t * 1000:.4f}' for t in times)))))
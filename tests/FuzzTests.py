@@ -0,0 +1,285 @@
+import os
+import time
+import pytest
+import numpy as np
+from DualNumber import DualNumber
+from DualTensor import DualTensor
+
+# Seconds spent generating cases for every operator (at least MIN_CASES are always run)
+BUDGET = float(os.environ.get('DUALGRAD_FUZZ_BUDGET', 0.25))
+MIN_CASES = 5
+EPS = 1e-6
+# Tolerance of the exact JVP computed in a given dtype against float64 finite differences
+RTOL = {np.float32: 1e-3, np.float64: 1e-6}
+
+
+def fuzz(check, make_case, seed=6741):
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + BUDGET
+    n = 0
+    while n < MIN_CASES or time.perf_counter() < deadline:
+        check(*make_case(rng))
+        n += 1
+
+
+def random_shape(rng, max_ndim=3, max_dim=32):
+    return tuple(int(d) for d in rng.integers(1, max_dim + 1, rng.integers(1, max_ndim + 1)))
+
+
+def broadcast_shape(rng, shape):
+    # Drop some leading axes and collapse some of the rest to 1
+    shape = shape[rng.integers(0, len(shape)):] or shape
+    return tuple(1 if rng.random() < 0.3 else d for d in shape)
+
+
+def random_values(rng, shape, positive=False):
+    # Magnitudes bounded away from zero keep abs/division/pow differentiable and well conditioned
+    x = rng.uniform(0.5, 2, shape)
+    if not positive:
+        x *= rng.choice([-1, 1], shape)
+    return x
+
+
+def same_case(rng):
+    shape = random_shape(rng)
+    return random_values(rng, shape), random_values(rng, shape)
+
+
+def broadcast_case(rng):
+    shape = random_shape(rng)
+    return random_values(rng, shape), random_values(rng, broadcast_shape(rng, shape))
+
+
+def matmul_case(rng):
+    batch = random_shape(rng, max_ndim=1, max_dim=4) if rng.random() < 0.3 else ()
+    m, k, n = rng.integers(1, 65, 3)
+    return random_values(rng, (*batch, m, k)), random_values(rng, (k, n))
+
+
+def equal_case(rng):
+    # About half of the elements are made equal so that == and <=/>= see both outcomes
+    x, y = same_case(rng)
+    return x, np.where(rng.random(x.shape) < 0.5, x, y)
+
+
+def pow_case(rng):
+    return random_values(rng, random_shape(rng), positive=True), rng.uniform(-2, 2, (1,))
+
+
+def jvp_check(f, x, y, dtype):
+    x = x.astype(dtype)
+    y = y.astype(dtype)
+    u = np.random.normal(size=x.shape).astype(dtype)
+    v = np.random.normal(size=y.shape).astype(dtype)
+    exact_grad = f(DualTensor(x, u), DualTensor(y, v)).im()
+    assert exact_grad.dtype == dtype
+    # Finite differences are always taken in float64 at the same (rounded) point
+    x, y, u, v = (t.astype(np.float64) for t in (x, y, u, v))
+    z1 = f(DualTensor(x - EPS * u), DualTensor(y - EPS * v)).re()
+    z2 = f(DualTensor(x + EPS * u), DualTensor(y + EPS * v)).re()
+    num_grad = (z2 - z1) / (2 * EPS)
+    assert exact_grad.shape == num_grad.shape
+    rel_tol = abs(num_grad - exact_grad) / (1 + np.minimum(abs(num_grad), abs(exact_grad)))
+    assert rel_tol.max() < RTOL[dtype], f'shapes {x.shape}, {y.shape}, dtype {dtype.__name__}'
+
+
+def no_grad_check(f, x, y, dtype):
+    x = DualTensor(x.astype(dtype), np.random.normal(size=x.shape).astype(dtype))
+    y = DualTensor(y.astype(dtype))
+    z = f(x, y)
+    assert (z.re() == f(x.re(), y.re())).all()
+    assert not z.im().any()
+
+
+def compare_check(f, x, y, dtype, tangents=True):
+    # Comparisons only look at the primal part; == also compares tangents, so it gets none
+    x, y = x.astype(dtype), y.astype(dtype)
+    u = np.random.normal(size=x.shape).astype(dtype) if tangents else None
+    v = np.random.normal(size=y.shape).astype(dtype) if tangents else None
+    assert (f(DualTensor(x, u), DualTensor(y, v)) == f(x, y)).all()
+
+
+TENSOR_OPS = {
+    'add': (lambda x, y: x + y, broadcast_case),
+    'radd': (lambda x, y: y.__radd__(x), broadcast_case),
+    'sub': (lambda x, y: x - y, broadcast_case),
+    'rsub': (lambda x, y: y.__rsub__(x), broadcast_case),
+    'neg': (lambda x, _: -x, same_case),
+    'abs': (lambda x, _: abs(x), same_case),
+    'mul': (lambda x, y: x * y, broadcast_case),
+    'rmul': (lambda x, y: y.__rmul__(x), broadcast_case),
+    'mul_scalar': (lambda x, _: x * 2.5, same_case),
+    'truediv': (lambda x, y: x / y, broadcast_case),
+    'rtruediv': (lambda x, y: y.__rtruediv__(x), broadcast_case),
+    'truediv_scalar': (lambda x, _: x / 1.5, same_case),
+    'matmul': (lambda x, y: x @ y, matmul_case),
+    'rmatmul': (lambda x, y: y.__rmatmul__(x), matmul_case),
+    'pow': (lambda x, y: x ** y, pow_case),
+    'rpow': (lambda x, y: y.__rpow__(x), pow_case),
+    'lshift': (lambda x, _: x << 2, same_case),
+    'rshift': (lambda x, _: x >> 2, same_case),
+}
+
+TENSOR_NO_GRAD_OPS = {
+    'floordiv': (lambda x, y: x // y, same_case),
+    'mod': (lambda x, y: x % y, same_case),
+}
+
+
+TENSOR_COMPARE_OPS = {
+    'lt': lambda x, y: x < y,
+    'le': lambda x, y: x <= y,
+    'gt': lambda x, y: x > y,
+    'ge': lambda x, y: x >= y,
+    'eq': lambda x, y: x == y,
+}
+
+
+@pytest.mark.parametrize('op', TENSOR_OPS)
+def test_tensor_jvp(op):
+    f, make_case = TENSOR_OPS[op]
+    np.random.seed(6741)
+
+    def case(rng):
+        return (*make_case(rng), rng.choice([np.float32, np.float64]))
+
+    fuzz(lambda x, y, dtype: jvp_check(f, x, y, dtype), case)
+
+
+@pytest.mark.parametrize('op', TENSOR_NO_GRAD_OPS)
+def test_tensor_no_grad(op):
+    f, make_case = TENSOR_NO_GRAD_OPS[op]
+    np.random.seed(6741)
+
+    def case(rng):
+        return (*make_case(rng), rng.choice([np.float32, np.float64]))
+
+    fuzz(lambda x, y, dtype: no_grad_check(f, x, y, dtype), case)
+
+
+@pytest.mark.parametrize('op', TENSOR_COMPARE_OPS)
+def test_tensor_compare(op):
+    f = TENSOR_COMPARE_OPS[op]
+    np.random.seed(6741)
+
+    def case(rng):
+        return (*equal_case(rng), rng.choice([np.float32, np.float64]))
+
+    fuzz(lambda x, y, dtype: compare_check(f, x, y, dtype, tangents=op != 'eq'), case)
+
+
+def scalar_case(rng):
+    x, y = random_values(rng, 2)
+    return float(x), float(y)
+
+
+def scalar_pow_case(rng):
+    return float(rng.uniform(0.5, 2)), float(rng.uniform(-2, 2))
+
+
+def scalar_equal_case(rng):
+    x, y = scalar_case(rng)
+    return x, x if rng.random() < 0.5 else y
+
+
+def scalar_jvp_check(f, x, y):
+    u, v = np.random.normal(size=2)
+    exact_grad = f(DualNumber(x, u), DualNumber(y, v)).im()
+    z1 = f(DualNumber(x - EPS * u), DualNumber(y - EPS * v)).re()
+    z2 = f(DualNumber(x + EPS * u), DualNumber(y + EPS * v)).re()
+    num_grad = (z2 - z1) / (2 * EPS)
+    rel_tol = abs(num_grad - exact_grad) / (1 + min(abs(num_grad), abs(exact_grad)))
+    assert rel_tol < RTOL[np.float64], f'values {x}, {y}'
+
+
+NUMBER_OPS = {
+    'add': (lambda x, y: x + y, scalar_case),
+    'radd': (lambda x, y: y.__radd__(x), scalar_case),
+    'add_float': (lambda x, _: x + 2.5, scalar_case),
+    'radd_float': (lambda x, _: 2.5 + x, scalar_case),
+    'sub': (lambda x, y: x - y, scalar_case),
+    'rsub': (lambda x, y: y.__rsub__(x), scalar_case),
+    'sub_float': (lambda x, _: x - 2.5, scalar_case),
+    'rsub_float': (lambda x, _: 2.5 - x, scalar_case),
+    'neg': (lambda x, _: -x, scalar_case),
+    'abs': (lambda x, _: abs(x), scalar_case),
+    'mul': (lambda x, y: x * y, scalar_case),
+    'rmul': (lambda x, y: y.__rmul__(x), scalar_case),
+    'mul_float': (lambda x, _: x * 2.5, scalar_case),
+    'rmul_float': (lambda x, _: 2.5 * x, scalar_case),
+    'truediv': (lambda x, y: x / y, scalar_case),
+    'rtruediv': (lambda x, y: y.__rtruediv__(x), scalar_case),
+    'truediv_float': (lambda x, _: x / 2.5, scalar_case),
+    'rtruediv_float': (lambda x, _: 2.5 / x, scalar_case),
+    'pow': (lambda x, y: x ** y, scalar_pow_case),
+    'rpow': (lambda x, y: y.__rpow__(x), scalar_pow_case),
+    'pow_float': (lambda x, _: x ** 2.5, scalar_pow_case),
+    'rpow_float': (lambda x, _: 2.5 ** x, scalar_case),
+    'lshift': (lambda x, _: x << 2, scalar_case),
+    'rshift': (lambda x, _: x >> 2, scalar_case),
+}
+
+
+def scalar_no_grad_check(f, x, y):
+    u, v = np.random.normal(size=2)
+    z = f(DualNumber(x, u), DualNumber(y, v))
+    assert z.re() == f(x, y), f'values {x}, {y}'
+    assert z.im() == 0
+
+
+def scalar_compare_check(f, x, y, tangents=True):
+    u, v = np.random.normal(size=2) if tangents else (0., 0.)
+    assert f(DualNumber(x, u), DualNumber(y, v)) == f(x, y), f'values {x}, {y}'
+
+
+NUMBER_NO_GRAD_OPS = {
+    'floordiv': lambda x, y: x // y,
+    'rfloordiv': lambda x, y: y.__rfloordiv__(x),
+    'floordiv_float': lambda x, _: x // 2.5,
+    'rfloordiv_float': lambda x, _: 2.5 // x,
+    'mod': lambda x, y: x % y,
+    'rmod': lambda x, y: y.__rmod__(x),
+    'mod_float': lambda x, _: x % 2.5,
+    'rmod_float': lambda x, _: 2.5 % x,
+}
+
+NUMBER_COMPARE_OPS = {
+    'lt': lambda x, y: x < y,
+    'le': lambda x, y: x <= y,
+    'gt': lambda x, y: x > y,
+    'ge': lambda x, y: x >= y,
+    'eq': lambda x, y: x == y,
+    'lt_float': lambda x, _: x < 1.,
+    'le_float': lambda x, _: x <= 1.,
+    'gt_float': lambda x, _: x > 1.,
+    'ge_float': lambda x, _: x >= 1.,
+    'eq_float': lambda x, _: x == 1.,
+}
+
+
+@pytest.mark.parametrize('op', NUMBER_OPS)
+def test_number_jvp(op):
+    f, make_case = NUMBER_OPS[op]
+    np.random.seed(6741)
+    fuzz(lambda x, y: scalar_jvp_check(f, x, y), make_case)
+
+
+@pytest.mark.parametrize('op', NUMBER_NO_GRAD_OPS)
+def test_number_no_grad(op):
+    f = NUMBER_NO_GRAD_OPS[op]
+    np.random.seed(6741)
+    fuzz(lambda x, y: scalar_no_grad_check(f, x, y), scalar_case)
+
+
+def scalar_float_equal_case(rng):
+    # Hits the float fast paths' equality branch against the constant 1.0 used above
+    x, y = scalar_equal_case(rng)
+    return (1. if rng.random() < 0.5 else x), y
+
+
+@pytest.mark.parametrize('op', NUMBER_COMPARE_OPS)
+def test_number_compare(op):
+    f = NUMBER_COMPARE_OPS[op]
+    np.random.seed(6741)
+    make_case = scalar_float_equal_case if op.endswith('_float') else scalar_equal_case
+    fuzz(lambda x, y: scalar_compare_check(f, x, y, tangents=not op.startswith('eq')), make_case)
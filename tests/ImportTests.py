@@ -0,0 +1,14 @@
+import pytest
+from benchmark.ImportBenchmark import startup_benchmark
+
+
+@pytest.mark.parametrize('module', ['benchmark.BenchmarkNetDual', 'benchmark.Benchmark', 'DualTensor', 'DualNumber'])
+def test_dual_path_is_lightweight(module):
+    _, heavy, times = startup_benchmark(f'import {module}')
+    assert heavy == []
+    assert module in times
+
+
+def test_torch_backend_is_lazy():
+    _, heavy, _ = startup_benchmark('import benchmark.Benchmark as b; b.load_net("auto")')
+    assert 'torch' in heavy
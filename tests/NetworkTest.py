@@ -1,8 +1,10 @@
-from benchmark.BenchmarkNetDual import BenchmarkNetDual as DualNet
+from benchmark.BenchmarkNetDual import BenchmarkNetDual as DualNet, jvp
 from benchmark.BenchmarkNetTorch import BenchmarkNetTorch as TorchNet
 from benchmark.Benchmark import random_gradvec
+from benchmark.GradCache import GradCache
 import torch
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 
 def rand(*size):
@@ -48,3 +50,141 @@ def test_fullgrad():
 def test_vectorgrad():
     dnet, tnet, x, vec = setup(True)
     assert (dnet.vectorgrad(x, vec) - tnet.vectorgrad(x, vec)) < 1e-5
+
+
+def test_vectorgrad_streaming():
+    dnet, tnet, x, vec = setup(True)
+    streamed = dnet.vectorgrad_streaming(x, lambda i: vec[i])
+    assert abs(streamed - tnet.vectorgrad(x, vec)) < 1e-5
+    assert abs(streamed - dnet.vectorgrad(x, vec)) < 1e-10
+
+
+def test_vectorgrad_keeps_weights():
+    dnet, tnet, x, vec = setup(True)
+    before = [(w.copy(), b.copy()) for w, b in dnet.params()]
+    dnet.vectorgrad(x, vec)
+    for (w, b), (bw, bb) in zip(dnet.layers, before):
+        assert (w.re() == bw).all() and (b.re() == bb).all()
+        assert not w.im().any() and not b.im().any()
+
+
+def test_jvp_reentrant():
+    dnet, tnet, x, vec = setup(True)
+    vecs = [[(gw * k, gb * k) for gw, gb in vec] for k in range(1, 9)]
+    expected = [dnet.vectorgrad(x, v) for v in vecs]
+    with ThreadPoolExecutor(4) as pool:
+        got = list(pool.map(lambda v: jvp(dnet.params(), v, x).im().sum(), vecs * 4))
+    assert np.allclose(got, expected * 4)
+
+
+def test_vectorgrad_batches():
+    dnet, tnet, x, vec = setup(True)
+    expected = dnet.vectorgrad(x, vec)
+    assert abs(dnet.vectorgrad_batches(x, vec, chunk_size=2) - expected) < 1e-5
+    assert abs(dnet.vectorgrad_batches(iter([x[:3], x[3:]]), vec) - expected) < 1e-5
+
+
+def test_vectorgrad_batches_memmap(tmp_path):
+    dnet, tnet, x, vec = setup(True)
+    data = np.lib.format.open_memmap(tmp_path / 'x.npy', mode='w+', dtype=x.dtype, shape=x.shape)
+    data[:] = x
+    data.flush()
+    assert abs(dnet.vectorgrad_batches(data, vec, chunk_size=3) - dnet.vectorgrad(x, vec)) < 1e-5
+
+
+def test_fullgrad_batches():
+    dnet, tnet, x = setup()
+    dgrad = dnet.fullgrad(x)
+    sgrad = dnet.fullgrad_batches(x, chunk_size=2)
+    assert len(dgrad) == len(sgrad)
+    for (dw, db), (sw, sb) in zip(dgrad, sgrad):
+        assert np.allclose(dw, sw, rtol=1e-5, atol=1e-5)
+        assert np.allclose(db, sb, rtol=1e-5, atol=1e-5)
+
+
+def grads_eq(a, b):
+    return all((dw == sw).all() and (db == sb).all() for (dw, db), (sw, sb) in zip(a, b))
+
+
+def test_fullgrad_cache():
+    dnet, tnet, x = setup()
+    expected = dnet.fullgrad(x)
+    cache = dnet.enable_fullgrad_cache()
+    assert grads_eq(dnet.fullgrad(x), expected)
+    assert len(cache) == 1
+    cached = dnet.fullgrad(x)
+    assert grads_eq(cached, expected)
+    # Callers mutating the result must not corrupt the cache
+    cached[0][0][:] = 0
+    assert grads_eq(dnet.fullgrad(x), expected)
+    assert len(cache) == 1
+
+
+def test_fullgrad_cache_invalidation():
+    dnet, tnet, x = setup()
+    dnet.enable_fullgrad_cache()
+    dnet.fullgrad(x)
+    dnet.layers[0][0].re()[0, 0] += 1
+    assert grads_eq(dnet.fullgrad(x), dnet.fullgrad_uncached(x))
+    dnet.clone_weights(TorchNet(dnet.depth, dnet.layer_size))
+    assert grads_eq(dnet.fullgrad(x), dnet.fullgrad_uncached(x))
+    assert len(dnet.fullgrad_cache) == 3
+
+
+def test_fullgrad_cache_eviction_and_persistence(tmp_path):
+    dnet, tnet, x = setup()
+    entry_size = sum(w.nbytes + b.nbytes for w, b in dnet.fullgrad(x))
+    cache = dnet.enable_fullgrad_cache(max_bytes=2 * entry_size, path=tmp_path / 'cache.npz')
+    xs = [x, x + 1, x + 2]
+    for xi in xs:
+        dnet.fullgrad(xi)
+    assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
+    assert cache.key(dnet.params(), xs[0]) not in cache
+    cache.save()
+    restored = dnet.enable_fullgrad_cache(path=tmp_path / 'cache.npz')
+    assert list(restored.entries) == list(cache.entries)
+    key = cache.key(dnet.params(), xs[2])
+    assert grads_eq(restored.get(key), cache.get(key))
+
+
+def test_float32_net():
+    dnet = DualNet(4, 8, dtype=np.float32)
+    x = rand(5, 8)
+    assert dnet.forward(x).dtype == np.float32
+    for (gw, gb), (w, b) in zip(dnet.fullgrad(x), dnet.layers):
+        assert gw.dtype == gb.dtype == np.float32
+        assert gw.shape == w.shape and gb.shape == b.shape
+
+
+def test_fullgrad_cache_path_without_suffix(tmp_path):
+    dnet, tnet, x = setup()
+    cache = dnet.enable_fullgrad_cache(path=tmp_path / 'cache')
+    dnet.fullgrad(x)
+    cache.save()
+    assert len(dnet.enable_fullgrad_cache(path=tmp_path / 'cache')) == 1
+
+
+def test_fullgrad_cache_threads():
+    grads = [(np.ones((8, 8)), np.ones(8))]
+    cache = GradCache(max_bytes=4 * (grads[0][0].nbytes + grads[0][1].nbytes))
+
+    def work(i):
+        for j in range(200):
+            key = str((i + j) % 10)
+            if cache.get(key) is None:
+                cache.put(key, grads)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(8)))
+    assert len(cache) == 4
+    assert cache.nbytes == sum(w.nbytes + b.nbytes for g in cache.entries.values() for w, b in g)
+
+
+def test_batches_empty():
+    dnet, tnet, x, vec = setup(True)
+    assert dnet.vectorgrad_batches(iter([]), vec) == 0
+    grads = dnet.fullgrad_batches(iter([]))
+    assert len(grads) == len(dnet.layers)
+    for (gw, gb), (w, b) in zip(grads, dnet.layers):
+        assert gw.shape == w.shape and gb.shape == b.shape
+        assert not gw.any() and not gb.any()
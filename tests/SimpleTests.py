@@ -113,3 +113,21 @@ def test_pow():
 
 def test_rpow():
     run_test(lambda x, y: y.__rpow__(x))
+
+
+@pytest.mark.parametrize('f', [
+    lambda x, y: x + y, lambda x, y: y + x, lambda x, y: x - y, lambda x, y: y - x,
+    lambda x, y: x * y, lambda x, y: y * x, lambda x, y: x / y, lambda x, y: y / x,
+    lambda x, y: x // y, lambda x, y: y // x, lambda x, y: x % y, lambda x, y: y % x,
+    lambda x, y: x ** y, lambda x, y: y ** x,
+])
+def test_float_operand(f):
+    # Plain-number fast paths must agree with an equivalent zero-tangent DualNumber operand
+    np.random.seed(6741)
+    for x in generate(100):
+        x = adjust_zero(x)
+        for y in (0.5, 1., 2.5, 3.):
+            expected = f(x, DualNumber(y))
+            got = f(x, y)
+            assert np.isclose(got.re(), expected.re(), rtol=1e-12, equal_nan=True)
+            assert np.isclose(got.im(), expected.im(), rtol=1e-12, equal_nan=True)
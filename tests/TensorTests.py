@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from DualTensor import DualTensor
+from DualTensor import DualTensor, MATMUL_BLOCK
 from typing import Callable, Iterable
 
 
@@ -11,22 +11,27 @@ def generate(n, shape) -> Iterable[DualTensor]:
         yield DualTensor(x, y)
 
 
-def gradient_test(f: Callable[[DualTensor, DualTensor], DualTensor], shape1, shape2, eps=1e-5, rtol=5e-5):
-    a = generate(100, shape1)
-    b = generate(100, shape2)
-    for x, y in zip(a, b):
-        res_shape = f(x, y).shape
-        for idx in np.ndindex(res_shape):
-            z1 = f(x - eps, y).re()
-            z2 = f(x + eps, y).re()
-            assert z1.shape == z2.shape
-            num_grad = ((z2 - z1) / (2 * eps))[idx]
-            exact_grad_te = f(x.grad_target(idx), y.grad_nontarget()).im()
-            assert exact_grad_te.shape == z1.shape
-            exact_grad = exact_grad_te[idx]
-            if not np.isnan(exact_grad):
-                rel_tol = abs(num_grad - exact_grad) / (1 + np.minimum(abs(num_grad), abs(exact_grad)))
-                assert rel_tol < rtol
+def gradient_test(f: Callable[[DualTensor, DualTensor], DualTensor], shape1, shape2, eps=1e-5, rtol=5e-5, batched=True):
+    # Directional finite differences against a whole JVP: one evaluation covers every output element.
+    # When `f` broadcasts over a leading axis all samples are checked in a single call
+    a = np.round(np.random.random((100, *shape1)) * 20)
+    b = np.round(np.random.random((100, *shape2)) * 20)
+    v = np.random.normal(size=a.shape)
+    if batched:
+        samples = [(a, b, v)]
+    else:
+        samples = zip(a, b, v)
+    for x, y, d in samples:
+        y = DualTensor(y)
+        z1 = f(DualTensor(x - eps * d), y).re()
+        z2 = f(DualTensor(x + eps * d), y).re()
+        assert z1.shape == z2.shape
+        num_grad = (z2 - z1) / (2 * eps)
+        exact_grad = f(DualTensor(x, d), y.grad_nontarget()).im()
+        assert exact_grad.shape == z1.shape
+        mask = ~np.isnan(exact_grad)
+        rel_tol = abs(num_grad - exact_grad)[mask] / (1 + np.minimum(abs(num_grad), abs(exact_grad))[mask])
+        assert (rel_tol < rtol).all()
 
 
 def value_test(f: Callable[[DualTensor, DualTensor], DualTensor], f_real: Callable[[np.ndarray, np.ndarray], np.ndarray], shape1, shape2, rtol=1e-10):
@@ -40,13 +45,13 @@ def value_test(f: Callable[[DualTensor, DualTensor], DualTensor], f_real: Callab
         assert rel_tol.max() < rtol
 
 
-def run_test(f, shape1, shape2=None, run_grad=True):
+def run_test(f, shape1, shape2=None, run_grad=True, batched=True):
     if shape2 is None:
         shape2 = shape1
     np.random.seed(6741)
     value_test(f, f, shape1, shape2)
     if run_grad:
-        gradient_test(f, shape1, shape2)
+        gradient_test(f, shape1, shape2, batched=batched)
 
 
 def test_add():
@@ -112,13 +117,53 @@ def test_rmod():
 
 
 def test_pow():
-    run_test(lambda x, y: adjust_zero(x) ** y, (10, 10), (1,))
+    run_test(lambda x, y: adjust_zero(x) ** y, (10, 10), (1,), batched=False)
 
 
 def test_rpow():
-    run_test(lambda x, y: y.__rpow__(adjust_zero(x)), (10, 10), (1,))
+    run_test(lambda x, y: y.__rpow__(adjust_zero(x)), (10, 10), (1,), batched=False)
+
+
+def test_matmul():
+    run_test(lambda x, y: x @ y, (8, 6), (6, 4))
+
 
+def test_rmatmul():
+    run_test(lambda x, y: y.__rmatmul__(x), (8, 6), (6, 4))
 
-# TODO: Rewrite gradient checker
-# def test_matmul():
-#     run_test(lambda x, y: x @ y, (1, 2), (2, 1))
+
+@pytest.mark.parametrize('f', [
+    lambda x: x + x, lambda x: x + 1.5, lambda x: 1.5 + x, lambda x: x - 1.5, lambda x: 1.5 - x,
+    lambda x: -x, lambda x: abs(x), lambda x: x * 2.5, lambda x: 2.5 * x, lambda x: x @ x,
+    lambda x: x / 2.5, lambda x: 2.5 / adjust_zero(x), lambda x: x // 2.5, lambda x: x % 2.5,
+    lambda x: adjust_zero(x) ** 2., lambda x: x << 1, lambda x: x >> 1,
+])
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_dtype_preserved(f, dtype):
+    x = next(generate(1, (4, 4)))
+    x = DualTensor(x.re().astype(dtype), x.im().astype(dtype))
+    res = f(x)
+    assert res.re().dtype == dtype
+    assert res.im().dtype == dtype
+
+
+def test_no_copy():
+    a = np.random.random((3, 3)).astype(np.float32)
+    b = np.random.random((3, 3)).astype(np.float32)
+    x = DualTensor(a, b)
+    assert x.re() is a and x.im() is b
+    assert DualTensor(a, b.astype(np.float64)).im().dtype == np.float32
+    assert DualTensor(b=b).re().dtype == np.float32
+
+
+@pytest.mark.parametrize('block', [3, 7, 16, MATMUL_BLOCK])
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_fused_matmul(block, dtype):
+    np.random.seed(6741)
+    a, b = np.random.normal(size=(2, 50, 30)).astype(dtype)
+    c, d = np.random.normal(size=(2, 30, 20)).astype(dtype)
+    re, im = DualTensor.fused_matmul(a, b, c, d, block)
+    assert re.dtype == im.dtype == dtype
+    assert re.flags.c_contiguous and im.flags.c_contiguous
+    assert np.allclose(re, a @ c, rtol=1e-5, atol=1e-4)
+    assert np.allclose(im, a @ d + b @ c, rtol=1e-5, atol=1e-4)